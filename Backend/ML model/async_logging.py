@@ -0,0 +1,56 @@
+"""
+Background logging for the ML API servers
+Request handlers only enqueue log records; a listener thread formats and writes them
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+# Most records held while the listener thread catches up; beyond this new
+# records are dropped, so a blocked stdout never stalls requests or grows memory
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+_listener = None
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that discards records when the bounded queue is full"""
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop sentinel waits (briefly) for room in a full queue instead of raising"""
+
+    def enqueue_sentinel(self):
+        try:
+            self.queue.put(self._sentinel, timeout=1)
+        except queue.Full:
+            pass
+
+
+def setup_logging(level: int = logging.INFO):
+    """Route root logger output through a queue drained by a background thread (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    root = logging.getLogger()
+    root.addHandler(DroppingQueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = BoundedQueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush queued records on interpreter exit
+    atexit.register(_listener.stop)
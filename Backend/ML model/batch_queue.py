@@ -0,0 +1,112 @@
+"""
+Request batching for the FastAPI server
+Coalesces concurrent /predict calls into a single model call
+"""
+
+import asyncio
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from inference_core import FEATURES, cache_key, fill_input_row, predict_raw, prediction_cache
+
+# Flush a batch once it holds MAX_BATCH rows or its first row has waited MAX_WAIT seconds
+MAX_BATCH = 64
+MAX_WAIT = 0.002
+
+
+class BatchQueue:
+    """
+    Collects single-row predictions and runs them through the model together
+
+    A single consumer task owns the preallocated input buffer, stacks the
+    pending rows into it and runs the model off the event loop.
+    """
+
+    def __init__(self, max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._buffer = np.zeros((max_batch, len(FEATURES)), dtype=np.float32)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the consumer task (must be called from the running event loop)"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the consumer task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def put(
+        self,
+        humidity: float,
+        co2: float,
+        substrate_moisture: float,
+        light_intensity: float,
+        water_quality: float,
+        temperature: float,
+        species: str,
+    ) -> int:
+        """Queue one set of readings and wait for its predicted harvest cycle (3-6)"""
+        readings = (humidity, co2, substrate_moisture, light_intensity, water_quality, temperature, species)
+        key = cache_key(*readings) if prediction_cache.enabled else None
+        if key is not None:
+            harvest_cycle = prediction_cache.get(key)
+            if harvest_cycle is not None:
+                return harvest_cycle
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((readings, key, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[tuple, Optional[tuple], asyncio.Future]]:
+        """Wait for the first pending row, then gather more until the batch is full or MAX_WAIT elapses"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            n = len(batch)
+            for i, (readings, _, _) in enumerate(batch):
+                fill_input_row(self._buffer[i], *readings)
+
+            try:
+                # multi:softmax returns 0-3 -> shift to 3-6
+                raw_predictions = await asyncio.to_thread(predict_raw, self._buffer[:n])
+                # One label per row, or zip() below would silently mispair futures
+                if raw_predictions.shape != (n,):
+                    raise RuntimeError(f"predict_raw returned shape {raw_predictions.shape} for {n} rows")
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, key, future), raw_prediction in zip(batch, raw_predictions):
+                harvest_cycle = int(raw_prediction + 3)
+                if key is not None:
+                    prediction_cache.put(key, harvest_cycle)
+                if not future.done():
+                    future.set_result(harvest_cycle)
@@ -3,19 +3,52 @@ FastAPI Backend for Mushroom Yield Prediction
 Connects to the XGBoost ML model and predicts harvest cycle
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import Literal
-import joblib
-import pandas as pd
+from typing import Annotated, Literal
+from contextlib import asynccontextmanager
+import anyio.to_thread
+import msgspec
+import logging
 import os
 
+from async_logging import setup_logging
+from batch_queue import BatchQueue
+from inference_core import FEATURES, MUSHROOM_VARIETIES, classify_yield, warmup
+
+# Per-request logs are written by a background thread, off the request path
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Concurrent /predict calls are coalesced into one model call per batch
+batch_queue = BatchQueue()
+
+
+# Sync handlers are plain `def`, which FastAPI runs in its threadpool instead of
+# on the event loop. THREADPOOL_SIZE overrides the pool size (anyio default: 40)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-worker startup/shutdown: threadpool size, model warmup and the batching task"""
+    size = os.environ.get("THREADPOOL_SIZE")
+    if size:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = int(size)
+    warmup()
+    batch_queue.start()
+    try:
+        yield
+    finally:
+        await batch_queue.stop()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Mushroom Yield Predictor API",
     description="Predicts harvest cycle based on environmental conditions",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Enable CORS for React frontend
@@ -27,44 +60,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load the ML model
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(SCRIPT_DIR, "xgb_mushroom_model.joblib")
-
-print(f"Loading model from: {MODEL_PATH}")
-model = joblib.load(MODEL_PATH)
-print("[OK] Model loaded successfully!")
-
-# Feature columns in the exact order used during training
-FEATURES = [
-    "humidity_pct",
-    "CO2_ppm",
-    "substrate_moisture_pct",
-    "light_lux",
-    "water_quality_index",
-    "temp_C",
-    "mushroom_variety_Button",
-    "mushroom_variety_Lions Mane",
-    "mushroom_variety_Oyster",
-    "mushroom_variety_Reishi",
-    "mushroom_variety_Shiitake"
-]
-
-# Mushroom varieties (order matters for one-hot encoding)
-MUSHROOM_VARIETIES = ["Button", "Lions Mane", "Oyster", "Reishi", "Shiitake"]
-
-
-# Request model
-class PredictionRequest(BaseModel):
-    species: Literal["Oyster", "Shiitake", "Lions Mane", "Button", "Reishi"] = Field(
-        ..., description="Mushroom species"
-    )
-    humidity: float = Field(..., ge=0, le=100, description="Humidity percentage (0-100)")
-    co2: float = Field(..., ge=0, description="CO2 concentration in ppm")
-    substrate_moisture: float = Field(..., ge=0, le=100, description="Substrate moisture percentage")
-    light_intensity: float = Field(..., ge=0, description="Light intensity in lux")
-    water_quality: float = Field(..., ge=0, le=100, description="Water quality index (0-100)")
-    temperature: float = Field(..., description="Temperature in Celsius")
+
+# Request model (msgspec validates the JSON body in a single decode pass)
+class PredictionRequest(msgspec.Struct):
+    species: Annotated[
+        Literal["Oyster", "Shiitake", "Lions Mane", "Button", "Reishi"],
+        msgspec.Meta(description="Mushroom species")
+    ]
+    humidity: Annotated[float, msgspec.Meta(ge=0, le=100, description="Humidity percentage (0-100)")]
+    co2: Annotated[float, msgspec.Meta(ge=0, description="CO2 concentration in ppm")]
+    substrate_moisture: Annotated[float, msgspec.Meta(ge=0, le=100, description="Substrate moisture percentage")]
+    light_intensity: Annotated[float, msgspec.Meta(ge=0, description="Light intensity in lux")]
+    water_quality: Annotated[float, msgspec.Meta(ge=0, le=100, description="Water quality index (0-100)")]
+    temperature: Annotated[float, msgspec.Meta(description="Temperature in Celsius")]
+
+
+# OpenAPI request body for /predict (FastAPI cannot derive it from a raw Request)
+PREDICTION_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "application/json": {
+            "schema": msgspec.json.schema_components([PredictionRequest])[1]["PredictionRequest"]
+        }
+    },
+}
 
 
 # Response model
@@ -78,36 +97,8 @@ class PredictionResponse(BaseModel):
     input_received: dict = Field(..., description="Input data that was processed")
 
 
-def classify_yield(harvest_cycle: int) -> dict:
-    """Classify harvest cycle into yield category"""
-    if harvest_cycle == 6:
-        return {
-            "yield_category": "HIGH",
-            "yield_color": "#4ade80",
-            "description": "Excellent conditions! Expected high yield."
-        }
-    elif harvest_cycle == 5:
-        return {
-            "yield_category": "GOOD",
-            "yield_color": "#a3e635",
-            "description": "Good conditions. Healthy yield expected."
-        }
-    elif harvest_cycle == 4:
-        return {
-            "yield_category": "MEDIUM",
-            "yield_color": "#fbbf24",
-            "description": "Moderate conditions. Some adjustments recommended."
-        }
-    else:  # harvest_cycle == 3
-        return {
-            "yield_category": "LOW",
-            "yield_color": "#f87171",
-            "description": "Suboptimal conditions. Significant improvements needed."
-        }
-
-
 @app.get("/")
-async def root():
+def root():
     """Root endpoint with API info"""
     return {
         "name": "Mushroom Yield Predictor API",
@@ -120,7 +111,7 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
@@ -130,46 +121,46 @@ async def health_check():
     }
 
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict(request: PredictionRequest):
+@app.post(
+    "/predict",
+    response_model=PredictionResponse,
+    openapi_extra={"requestBody": PREDICTION_REQUEST_BODY}
+)
+async def predict(http_request: Request):
     """
     Predict harvest cycle based on environmental conditions
     
-    Returns harvest cycle (3-6) and yield classification (HIGH/GOOD/MEDIUM/LOW)
+    Returns harvest cycle (3-6) and yield classification (HIGH/GOOD/MEDIUM/LOW).
+    The model runs off the event loop, batched with other in-flight requests.
     """
     try:
-        # Prepare features with one-hot encoding
-        features = {
-            "humidity_pct": request.humidity,
-            "CO2_ppm": request.co2,
-            "substrate_moisture_pct": request.substrate_moisture,
-            "light_lux": request.light_intensity,
-            "water_quality_index": request.water_quality,
-            "temp_C": request.temperature,
-        }
-        
-        # One-hot encode mushroom variety
-        for variety in MUSHROOM_VARIETIES:
-            features[f"mushroom_variety_{variety}"] = 1 if request.species == variety else 0
-        
-        # Create DataFrame with correct feature order
-        df_input = pd.DataFrame([features])[FEATURES]
-        
-        # Predict using the model (XGBoost returns 0-3 -> shift to 3-6)
-        raw_prediction = model.predict(df_input)[0]
-        harvest_cycle = int(raw_prediction + 3)
-        
-        # Get yield classification
+        request = msgspec.json.decode(await http_request.body(), type=PredictionRequest)
+    except msgspec.DecodeError as e:
+        # Covers both malformed JSON and msgspec.ValidationError
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    try:
+        harvest_cycle = await batch_queue.put(
+            humidity=request.humidity,
+            co2=request.co2,
+            substrate_moisture=request.substrate_moisture,
+            light_intensity=request.light_intensity,
+            water_quality=request.water_quality,
+            temperature=request.temperature,
+            species=request.species,
+        )
         yield_info = classify_yield(harvest_cycle)
         
-        print(f"[PREDICT] {request.species} -> Cycle {harvest_cycle} ({yield_info['yield_category']})")
+        logger.info("[PREDICT] %s -> Cycle %d (%s)", request.species, harvest_cycle, yield_info["category"])
         
-        return PredictionResponse(
-            harvest_cycle=harvest_cycle,
-            yield_category=yield_info["yield_category"],
-            yield_color=yield_info["yield_color"],
-            description=yield_info["description"],
-            input_received={
+        # Return the response directly: fields are already valid, so skip the
+        # response_model revalidation (the model still documents the schema)
+        return ORJSONResponse(content={
+            "harvest_cycle": harvest_cycle,
+            "yield_category": yield_info["category"],
+            "yield_color": yield_info["color"],
+            "description": yield_info["description"],
+            "input_received": {
                 "species": request.species,
                 "humidity": request.humidity,
                 "co2": request.co2,
@@ -178,10 +169,10 @@ async def predict(request: PredictionRequest):
                 "water_quality": request.water_quality,
                 "temperature": request.temperature
             }
-        )
+        })
         
     except Exception as e:
-        print(f"[ERROR] Prediction failed: {e}")
+        logger.error("[ERROR] Prediction failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
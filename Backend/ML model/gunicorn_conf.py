@@ -0,0 +1,68 @@
+"""
+Gunicorn configuration for the ML API servers
+Runs many single-threaded workers: per-request inference is far cheaper than
+request handling, so scaling out processes beats threading each model call
+
+Usage (Linux/macOS; Gunicorn does not run on Windows):
+    gunicorn -c gunicorn_conf.py fastapi_server:app
+    gunicorn -c gunicorn_conf.py -k gthread -b 0.0.0.0:3002 ml_api:app
+"""
+
+import os
+
+# Keep each worker's model runtime single-threaded (inherited by forked workers).
+# OMP_PROC_BIND/OMP_PLACES are set per worker in post_fork: on_starting loads
+# xgboost (and libgomp) in the master, which would bind the master to one core
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("MKL_DYNAMIC", "FALSE")
+
+# Cores this server may use, read once before anything can narrow the master's
+# affinity (None where the OS has no affinity API, e.g. macOS)
+_CORES = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", len(_CORES) if _CORES else os.cpu_count()))
+threads = 1
+
+# ASGI worker for fastapi_server:app; pass `-k gthread` for the Flask ml_api:app
+# (the plain sync worker closes the connection after every response).
+# UvicornWorker picks httptools/uvloop automatically when they are installed
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Seconds an idle keep-alive connection stays open between requests
+keepalive = int(os.environ.get("KEEPALIVE", 5))
+
+# Each worker loads its own model after fork (inference sessions are not fork-safe);
+# the converted model artifact itself is built once in on_starting
+preload_app = False
+
+
+def on_starting(server):
+    """Build the converted model artifact in the master, before any worker forks"""
+    from model_artifacts import ensure_model_artifact
+
+    ensure_model_artifact()
+
+
+def pre_fork(server, worker):
+    """Assign the new worker the first CPU core no live worker is pinned to"""
+    if _CORES is None:
+        worker.cpu_core = None
+        return
+    used = {getattr(w, "cpu_core", None) for w in server.WORKERS.values()}
+    worker.cpu_core = next((core for core in _CORES if core not in used), None)
+
+
+def post_fork(server, worker):
+    """Pin the worker to its core so the scheduler cannot migrate it (Linux only)"""
+    # Runs before the worker imports the app, so the model runtime binds its
+    # thread inside this worker's affinity mask only
+    os.environ.setdefault("OMP_PROC_BIND", "close")
+    os.environ.setdefault("OMP_PLACES", "cores")
+    if worker.cpu_core is not None:
+        os.sched_setaffinity(0, {worker.cpu_core})
+        server.log.info(f"Worker {worker.pid} pinned to CPU {worker.cpu_core}")
+    elif _CORES is not None:
+        # More workers than cores: share every core rather than the master's mask
+        os.sched_setaffinity(0, _CORES)
@@ -0,0 +1,233 @@
+"""
+Shared inference core for Mushroom Yield Prediction
+Loads the XGBoost model once and predicts harvest cycle for every entrypoint
+(fastapi_server.py, ml_api.py, pythonml.py)
+"""
+
+import os
+
+# Single-row inference cannot use extra cores; stop the OpenMP runtime from
+# spinning up one thread per core (must be set before xgboost/tl2cgen load)
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+import numpy as np
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from model_artifacts import ARTIFACT_OPENERS, ML_BACKEND, MODEL_PATH, ensure_model_artifact
+
+# Number of recent predictions kept in memory (0 disables the cache)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 4096))
+
+# Feature columns in the exact order used during training
+# NOTE: Order must match exactly what the model expects!
+FEATURES = [
+    "humidity_pct",
+    "CO2_ppm",
+    "substrate_moisture_pct",
+    "light_lux",
+    "water_quality_index",
+    "temp_C",
+    "mushroom_variety_Button",
+    "mushroom_variety_Lions Mane",
+    "mushroom_variety_Oyster",
+    "mushroom_variety_Reishi",
+    "mushroom_variety_Shiitake"
+]
+
+# Mushroom varieties (order matters for one-hot encoding)
+MUSHROOM_VARIETIES = ["Button", "Lions Mane", "Oyster", "Reishi", "Shiitake"]
+
+# Column index of each variety's one-hot feature
+VARIETY_IDX = {variety: FEATURES.index(f"mushroom_variety_{variety}") for variety in MUSHROOM_VARIETIES}
+
+# Yield classification per harvest cycle, indexed by cycle:
+# - 6: High yield
+# - 5: Good yield
+# - 4: Medium yield
+# - 3: Low yield
+YIELD_TABLE = (
+    None,
+    None,
+    None,
+    MappingProxyType({
+        "category": "LOW",
+        "color": "#f87171",  # red
+        "description": "Suboptimal conditions. Significant improvements needed."
+    }),
+    MappingProxyType({
+        "category": "MEDIUM",
+        "color": "#fbbf24",  # yellow
+        "description": "Moderate conditions. Some adjustments recommended."
+    }),
+    MappingProxyType({
+        "category": "GOOD",
+        "color": "#a3e635",  # lime
+        "description": "Good conditions. Healthy yield expected."
+    }),
+    MappingProxyType({
+        "category": "HIGH",
+        "color": "#4ade80",  # green
+        "description": "Excellent conditions! Expected high yield."
+    }),
+)
+
+
+# Load the model once per process (building the converted artifact first if missing or stale)
+print(f"Loading model from: {MODEL_PATH} (backend: {ML_BACKEND})")
+predict_raw = ARTIFACT_OPENERS[ML_BACKEND](ensure_model_artifact(ML_BACKEND))
+print("[OK] Model loaded successfully!")
+
+# Preallocated input row reused by every prediction (guarded by INPUT_LOCK)
+INPUT_BUFFER = np.zeros((1, len(FEATURES)), dtype=np.float32)
+INPUT_LOCK = threading.Lock()
+
+
+def classify_yield(harvest_cycle: int) -> Mapping[str, str]:
+    """
+    Classify harvest cycle into yield category
+
+    The returned mapping is read-only and shared between requests;
+    copy it before adding fields.
+    """
+    return YIELD_TABLE[harvest_cycle]
+
+
+def warmup():
+    """Run one prediction on a zero row so the first request skips lazy runtime setup"""
+    predict_raw(np.zeros_like(INPUT_BUFFER))
+    print("[OK] Model warmed up")
+
+
+def fill_input_row(
+    row: np.ndarray,
+    humidity: float,
+    co2: float,
+    substrate_moisture: float,
+    light_intensity: float,
+    water_quality: float,
+    temperature: float,
+    species: str,
+) -> None:
+    """
+    Write one set of readings into a FEATURES-ordered input row
+
+    Unknown species leave every one-hot variety column at 0.
+    """
+    row[0] = humidity
+    row[1] = co2
+    row[2] = substrate_moisture
+    row[3] = light_intensity
+    row[4] = water_quality
+    row[5] = temperature
+    row[6:] = 0
+    variety_idx = VARIETY_IDX.get(species)
+    if variety_idx is not None:
+        row[variety_idx] = 1
+
+
+def cache_key(
+    humidity: float,
+    co2: float,
+    substrate_moisture: float,
+    light_intensity: float,
+    water_quality: float,
+    temperature: float,
+    species: str,
+) -> tuple:
+    """
+    Build the prediction cache key for one set of readings
+
+    Values are cast to float32 exactly as fill_input_row() stores them, so two
+    requests share a key only when the model sees an identical input row.
+    """
+    return (
+        float(np.float32(humidity)),
+        float(np.float32(co2)),
+        float(np.float32(substrate_moisture)),
+        float(np.float32(light_intensity)),
+        float(np.float32(water_quality)),
+        float(np.float32(temperature)),
+        species,
+    )
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of harvest cycles keyed by cache_key()"""
+
+    def __init__(self, maxsize: int = PREDICTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.enabled = maxsize > 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[int]:
+        with self._lock:
+            harvest_cycle = self._entries.get(key)
+            if harvest_cycle is not None:
+                self._entries.move_to_end(key)
+            return harvest_cycle
+
+    def put(self, key: tuple, harvest_cycle: int):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = harvest_cycle
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+prediction_cache = PredictionCache()
+
+
+def predict_harvest_cycle(
+    humidity: float,
+    co2: float,
+    substrate_moisture: float,
+    light_intensity: float,
+    water_quality: float,
+    temperature: float,
+    species: str,
+) -> Tuple[int, Mapping[str, str]]:
+    """Predict harvest cycle (3–6) and its yield classification"""
+    readings = (humidity, co2, substrate_moisture, light_intensity, water_quality, temperature, species)
+    key = cache_key(*readings) if prediction_cache.enabled else None
+    if key is not None:
+        harvest_cycle = prediction_cache.get(key)
+        if harvest_cycle is not None:
+            return harvest_cycle, classify_yield(harvest_cycle)
+
+    with INPUT_LOCK:
+        fill_input_row(INPUT_BUFFER[0], *readings)
+
+        # Predict using the converted model (multi:softmax returns 0–3 → shift to 3–6)
+        raw_prediction = predict_raw(INPUT_BUFFER)[0]
+
+    harvest_cycle = int(raw_prediction + 3)
+    if key is not None:
+        prediction_cache.put(key, harvest_cycle)
+    return harvest_cycle, classify_yield(harvest_cycle)
+
+
+def predict_feature_row(features: Mapping[str, float]) -> Tuple[int, Mapping[str, str]]:
+    """
+    Predict harvest cycle (3–6) from a FEATURES-keyed row (one-hot varieties, as in the dataset)
+
+    The row is mapped onto predict_harvest_cycle(), so it shares the prediction
+    cache; the first variety column set to 1 selects the species.
+    """
+    species = next(
+        (variety for variety in MUSHROOM_VARIETIES if features[f"mushroom_variety_{variety}"]), None
+    )
+    return predict_harvest_cycle(
+        humidity=features["humidity_pct"],
+        co2=features["CO2_ppm"],
+        substrate_moisture=features["substrate_moisture_pct"],
+        light_intensity=features["light_lux"],
+        water_quality=features["water_quality_index"],
+        temperature=features["temp_C"],
+        species=species,
+    )
@@ -5,103 +5,36 @@ Exposes the XGBoost model via a REST API
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import joblib
-import pandas as pd
+import logging
 import os
 
-app = Flask(__name__)
-CORS(app)
-
-# Get the directory where this script is located
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(SCRIPT_DIR, "xgb_mushroom_model.joblib")
-
-# Load the saved model
-print(f"Loading model from: {MODEL_PATH}")
-model = joblib.load(MODEL_PATH)
-print("[OK] Model loaded successfully!")
+from async_logging import setup_logging
+from inference_core import FEATURES, predict_harvest_cycle, warmup
 
-# Feature columns in the exact order used during training
-# NOTE: Order must match exactly what the model expects!
-FEATURES = [
-    "humidity_pct",
-    "CO2_ppm",
-    "substrate_moisture_pct",
-    "light_lux",
-    "water_quality_index",
-    "temp_C",
-    "mushroom_variety_Button",
-    "mushroom_variety_Lions Mane",
-    "mushroom_variety_Oyster",
-    "mushroom_variety_Reishi",
-    "mushroom_variety_Shiitake"
-]
-
-# Mushroom variety options (order matters for one-hot encoding)
-MUSHROOM_VARIETIES = ["Button", "Lions Mane", "Oyster", "Reishi", "Shiitake"]
+# Per-request logs are written by a background thread, off the request path
+setup_logging()
+logger = logging.getLogger(__name__)
 
+app = Flask(__name__)
+CORS(app)
 
-def classify_yield(harvest_cycle: int) -> dict:
-    """
-    Classify harvest cycle into yield category
-    
-    Harvest cycles:
-    - 6: High yield
-    - 5: Good yield
-    - 4: Medium yield
-    - 3: Low yield
-    """
-    if harvest_cycle == 6:
-        return {
-            "category": "HIGH",
-            "color": "#4ade80",  # green
-            "description": "Excellent conditions! Expected high yield.",
-            "harvest_cycle": harvest_cycle
-        }
-    elif harvest_cycle == 5:
-        return {
-            "category": "GOOD",
-            "color": "#a3e635",  # lime
-            "description": "Good conditions. Healthy yield expected.",
-            "harvest_cycle": harvest_cycle
-        }
-    elif harvest_cycle == 4:
-        return {
-            "category": "MEDIUM",
-            "color": "#fbbf24",  # yellow
-            "description": "Moderate conditions. Some adjustments recommended.",
-            "harvest_cycle": harvest_cycle
-        }
-    else:  # harvest_cycle == 3
-        return {
-            "category": "LOW",
-            "color": "#f87171",  # red
-            "description": "Suboptimal conditions. Significant improvements needed.",
-            "harvest_cycle": harvest_cycle
-        }
+# Warm up the prediction path so the first request skips lazy runtime setup
+warmup()
 
 
 def prepare_features(data: dict) -> dict:
     """
-    Prepare input data with one-hot encoded mushroom variety
+    Read the model inputs from the request body, applying defaults
     """
-    species = data.get("species", "Oyster")
-    
-    # Create feature dictionary
-    features = {
+    return {
+        "species": data.get("species", "Oyster"),
+        "temperature_c": data.get("temperature_c", 22),
         "humidity_pct": data.get("humidity_pct", 85),
-        "CO2_ppm": data.get("co2_ppm", 800),
-        "substrate_moisture_pct": data.get("substrate_moisture", 65),
+        "co2_ppm": data.get("co2_ppm", 800),
+        "substrate_moisture": data.get("substrate_moisture", 65),
         "light_lux": data.get("light_lux", 200),
         "water_quality_index": data.get("water_quality_index", 80),
-        "temp_C": data.get("temperature_c", 22),
     }
-    
-    # One-hot encode mushroom variety
-    for variety in MUSHROOM_VARIETIES:
-        features[f"mushroom_variety_{variety}"] = 1 if species == variety else 0
-    
-    return features
 
 
 @app.route('/api/health', methods=['GET'])
@@ -137,36 +70,27 @@ def predict():
         if not data:
             return jsonify({"error": "No data provided"}), 400
         
-        # Prepare features with one-hot encoding
-        features = prepare_features(data)
-        
-        # Create DataFrame with correct feature order
-        df_input = pd.DataFrame([features])[FEATURES]
+        # Prepare features (one-hot encoding happens in the inference core)
+        inputs = prepare_features(data)
         
-        # Predict using the loaded model (XGBoost returns 0–3 → shift to 3–6)
-        raw_prediction = model.predict(df_input)[0]
-        harvest_cycle = int(raw_prediction + 3)
+        # Predict and classify the yield
+        harvest_cycle, yield_info = predict_harvest_cycle(
+            humidity=inputs["humidity_pct"],
+            co2=inputs["co2_ppm"],
+            substrate_moisture=inputs["substrate_moisture"],
+            light_intensity=inputs["light_lux"],
+            water_quality=inputs["water_quality_index"],
+            temperature=inputs["temperature_c"],
+            species=inputs["species"],
+        )
         
-        # Classify the yield
-        yield_info = classify_yield(harvest_cycle)
+        logger.info("[PREDICT] %s -> Cycle %d (%s)", inputs["species"], harvest_cycle, yield_info["category"])
         
         # Add input data to response for reference
-        yield_info["input"] = {
-            "species": data.get("species", "Oyster"),
-            "temperature_c": features["temp_C"],
-            "humidity_pct": features["humidity_pct"],
-            "co2_ppm": features["CO2_ppm"],
-            "substrate_moisture": features["substrate_moisture_pct"],
-            "light_lux": features["light_lux"],
-            "water_quality_index": features["water_quality_index"],
-        }
-        
-        print(f"[PREDICT] {data.get('species', 'Oyster')} -> Cycle {harvest_cycle} ({yield_info['category']})")
-        
-        return jsonify(yield_info)
+        return jsonify({**yield_info, "harvest_cycle": harvest_cycle, "input": inputs})
         
     except Exception as e:
-        print(f"[ERROR] Prediction error: {e}")
+        logger.error("[ERROR] Prediction error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -0,0 +1,175 @@
+"""
+Converted model artifacts for the ML API servers
+Builds the ONNX model / Treelite library from the trained XGBoost model and opens
+inference sessions on them; a Gunicorn master builds (and validates) the artifact
+before forking, and each worker opens its own session
+"""
+
+import csv
+import os
+import sys
+from itertools import islice
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(SCRIPT_DIR, "xgb_mushroom_model.joblib")
+ONNX_PATH = os.path.join(SCRIPT_DIR, "mushroom.onnx")
+DATASET_PATH = os.path.join(SCRIPT_DIR, "FINALDATASET2.csv")
+
+# Dataset rows a freshly built artifact must reproduce before it is installed
+VALIDATION_ROWS = 256
+
+# Inference runtime: "onnx" (ONNX Runtime) or "treelite" (needs a C toolchain)
+ML_BACKEND = os.environ.get("ML_BACKEND", "onnx")
+
+# Treelite only: compare quantized (integer) thresholds instead of floats.
+# Lossless, and packs more tree nodes per cache line; set to 0 to disable
+TREELITE_QUANTIZE = os.environ.get("TREELITE_QUANTIZE", "1") == "1"
+LIB_PATH = os.path.join(
+    SCRIPT_DIR,
+    ("mushroom_q" if TREELITE_QUANTIZE else "mushroom") + (".dll" if sys.platform == "win32" else ".so")
+)
+
+
+def is_stale(artifact_path: str) -> bool:
+    """Check if a converted model artifact is missing or older than the model file"""
+    return not os.path.exists(artifact_path) or os.path.getmtime(artifact_path) < os.path.getmtime(MODEL_PATH)
+
+
+def load_xgb_model():
+    """
+    Load the trained XGBClassifier from MODEL_PATH
+
+    Only needed to (re)build a converted artifact, so joblib, xgboost and
+    scikit-learn are imported here: workers serving an up-to-date artifact
+    never load them.
+    """
+    import joblib
+
+    return joblib.load(MODEL_PATH)
+
+
+def load_validation_rows(feature_names: list) -> np.ndarray:
+    """Read the first VALIDATION_ROWS dataset rows in the model's feature order"""
+    rows = []
+    with open(DATASET_PATH, newline="") as f:
+        for record in islice(csv.DictReader(f), VALIDATION_ROWS):
+            row = []
+            for name in feature_names:
+                if name.startswith("mushroom_variety_"):
+                    row.append(float(record["mushroom_variety"] == name[len("mushroom_variety_"):]))
+                else:
+                    row.append(float(record[name]))
+            rows.append(row)
+    return np.array(rows, dtype=np.float32)
+
+
+def open_treelite_predictor(libpath: str):
+    """Load a compiled Treelite library and return a batch predict function"""
+    import tl2cgen
+
+    predictor = tl2cgen.Predictor(libpath, nthread=1)
+
+    def predict_raw(arr: np.ndarray) -> np.ndarray:
+        # tl2cgen returns (num_row, num_target, num_class): one column per
+        # class when the model emits probabilities, a single label otherwise
+        out = predictor.predict(tl2cgen.DMatrix(arr)).reshape(len(arr), -1)
+        return out.argmax(axis=1) if out.shape[1] > 1 else out[:, 0]
+
+    return predict_raw
+
+
+def open_onnx_predictor(onnx_path: str):
+    """Open an ONNX Runtime session and return a batch predict function"""
+    import onnxruntime as ort
+
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = 1
+    opts.inter_op_num_threads = 1
+    session = ort.InferenceSession(onnx_path, sess_options=opts, providers=["CPUExecutionProvider"])
+
+    def predict_raw(arr: np.ndarray) -> np.ndarray:
+        # First output is the predicted label (shape (n,)), second the class probabilities
+        return session.run(None, {"input": arr})[0].reshape(len(arr))
+
+    return predict_raw
+
+
+def build_treelite_artifact(model, libpath: str):
+    """Compile the XGBoost model to a native Treelite library at `libpath`"""
+    import tl2cgen
+    import treelite
+
+    tl2cgen.export_lib(
+        treelite.frontend.from_xgboost(model.get_booster()),
+        toolchain="msvc" if sys.platform == "win32" else "gcc",
+        libpath=libpath,
+        params={"parallel_comp": 1, "quantize": int(TREELITE_QUANTIZE)},
+    )
+
+
+def build_onnx_artifact(model, onnx_path: str):
+    """Convert the XGBoost model to an ONNX file at `onnx_path`"""
+    from onnxmltools.convert import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+
+    booster = model.get_booster()
+    num_features = booster.num_features()
+    # The converter only understands positional "f<i>" split features
+    booster.feature_names = None
+    onnx_model = convert_xgboost(model, initial_types=[("input", FloatTensorType([None, num_features]))])
+    with open(onnx_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+
+
+ARTIFACT_BUILDERS = {
+    "onnx": (ONNX_PATH, build_onnx_artifact),
+    "treelite": (LIB_PATH, build_treelite_artifact),
+}
+
+# Each opener returns predict_raw(arr) -> one label per input row, shape (n,)
+ARTIFACT_OPENERS = {
+    "onnx": open_onnx_predictor,
+    "treelite": open_treelite_predictor,
+}
+
+
+def validate_artifact(backend: str, artifact_path: str, rows: np.ndarray, expected: np.ndarray):
+    """Raise RuntimeError unless the artifact predicts the same labels as the XGBoost model"""
+    predicted = np.asarray(ARTIFACT_OPENERS[backend](artifact_path)(rows)).astype(int)
+    if predicted.shape != expected.shape:
+        raise RuntimeError(f"{backend} artifact returned shape {predicted.shape}, expected {expected.shape}")
+    mismatches = int(np.count_nonzero(predicted != expected))
+    if mismatches:
+        raise RuntimeError(f"{backend} artifact disagrees with {MODEL_PATH} on {mismatches}/{len(rows)} rows")
+
+
+def ensure_model_artifact(backend: str = ML_BACKEND) -> str:
+    """
+    Build the artifact for `backend` if it is missing or stale and return its path
+
+    The artifact is built under a per-process temporary name, checked against
+    the XGBoost model's predictions on the first dataset rows, and only then
+    moved into place with os.replace, so concurrent readers (other workers or
+    servers) only ever see a missing or a complete, validated file.
+    """
+    artifact_path, build = ARTIFACT_BUILDERS[backend]
+    if not is_stale(artifact_path):
+        return artifact_path
+
+    print(f"Building {backend} model artifact: {artifact_path}")
+    root, ext = os.path.splitext(artifact_path)
+    tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+    model = load_xgb_model()
+    # Reference labels come first: the ONNX build clears the booster's feature names
+    rows = load_validation_rows(model.get_booster().feature_names)
+    expected = np.asarray(model.predict(rows, validate_features=False)).astype(int)
+    try:
+        build(model, tmp_path)
+        validate_artifact(backend, tmp_path, rows, expected)
+        os.replace(tmp_path, artifact_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return artifact_path
@@ -4,9 +4,14 @@
 
 This script starts all the required services:
 1. ML API Server (Python Flask - port 3002)
-2. Chatbot Backend Server (Node.js Express - port 3001)
-3. Frontend Dev Server (Vite - port 5173)
-4. Ollama (if not running)
+2. ML Predictor API (Python FastAPI - port 8000)
+3. Chatbot Backend Server (Node.js Express - port 3001)
+4. Frontend Dev Server (Vite - port 5173)
+5. Ollama (if not running)
+
+On Linux/macOS both ML APIs run under Gunicorn with one single-threaded
+worker per CPU core (see Backend/ML model/gunicorn_conf.py), or as a
+single `python3 <script>.py` process if Gunicorn is not installed.
 
 Usage:
     python start_all.py
@@ -18,14 +23,28 @@ import subprocess
 import sys
 import os
 import time
+import shutil
+import errno
+import select
 import socket
 import signal
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.absolute()
 
+# Default environment for the ML API processes: single-threaded model runtime.
+# Thread binding (OMP_PROC_BIND/OMP_PLACES) is left to gunicorn_conf.py, which
+# sets it per worker after pinning; here it would bind the whole server to one
+# core. Values already set in the user's environment win
+ML_WORKER_ENV = {
+    "OMP_NUM_THREADS": "1",
+    "MKL_NUM_THREADS": "1",
+    "MKL_DYNAMIC": "FALSE",
+}
+
 # Service configurations
 SERVICES = {
     "ml_api": {
@@ -33,9 +52,21 @@ SERVICES = {
         "port": 3002,
         "cwd": PROJECT_ROOT / "Backend" / "ML model",
         "cmd_windows": ["python", "ml_api.py"],
-        "cmd_unix": ["python3", "ml_api.py"],
+        "cmd_unix": ["gunicorn", "-c", "gunicorn_conf.py", "-k", "gthread", "-b", "0.0.0.0:3002", "ml_api:app"],
+        "cmd_fallback": ["python3", "ml_api.py"],
+        "env": ML_WORKER_ENV,
         "health_url": "http://localhost:3002/api/health"
     },
+    "ml_fastapi": {
+        "name": "📈 ML Predictor API (FastAPI)",
+        "port": 8000,
+        "cwd": PROJECT_ROOT / "Backend" / "ML model",
+        "cmd_windows": ["python", "fastapi_server.py"],
+        "cmd_unix": ["gunicorn", "-c", "gunicorn_conf.py", "fastapi_server:app"],
+        "cmd_fallback": ["python3", "fastapi_server.py"],
+        "env": ML_WORKER_ENV,
+        "health_url": "http://localhost:8000/health"
+    },
     "chatbot_backend": {
         "name": "🍄 Chatbot Backend",
         "port": 3001,
@@ -54,6 +85,16 @@ SERVICES = {
     }
 }
 
+# Default Ollama server port
+OLLAMA_PORT = 11434
+
+# Delay between readiness probes while a service's port is still closed
+CONNECT_RETRY_INTERVAL = 0.05
+# Longest single wait on a pending connect before re-checking the service process
+PROCESS_POLL_INTERVAL = 0.5
+# connect_ex() results of a non-blocking connect that is done or still in progress
+CONNECT_PENDING_ERRORS = {0, errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK)}
+
 # Track running processes for cleanup
 running_processes = []
 
@@ -65,14 +106,8 @@ def is_port_in_use(port: int) -> bool:
 
 
 def check_ollama() -> bool:
-    """Check if Ollama is running"""
-    try:
-        import urllib.request
-        req = urllib.request.Request("http://localhost:11434/api/tags")
-        with urllib.request.urlopen(req, timeout=2) as response:
-            return response.status == 200
-    except:
-        return False
+    """Check if Ollama is running (something is listening on its port)"""
+    return is_port_in_use(OLLAMA_PORT)
 
 
 def start_ollama():
@@ -108,6 +143,16 @@ def start_ollama():
         return False
 
 
+def resolve_command(cmd: list) -> list | None:
+    """Resolve a command's executable to an absolute path so it can run without a shell"""
+    if cmd[0] in ("python", "python3"):
+        return [sys.executable, *cmd[1:]]
+    executable = shutil.which(cmd[0])
+    if executable is None:
+        return None
+    return [executable, *cmd[1:]]
+
+
 def start_service(service_key: str, config: dict) -> subprocess.Popen | None:
     """Start a service and return its process"""
     name = config["name"]
@@ -126,24 +171,36 @@ def start_service(service_key: str, config: dict) -> subprocess.Popen | None:
     
     # Get the appropriate command
     cmd = config["cmd_windows"] if sys.platform == "win32" else config["cmd_unix"]
+    resolved_cmd = resolve_command(cmd)
+    if resolved_cmd is None and "cmd_fallback" in config:
+        # e.g. Gunicorn not installed: run the single-process server instead
+        print(f"⚠️  {name} - {cmd[0]} not found, falling back to: {' '.join(config['cmd_fallback'])}")
+        cmd = config["cmd_fallback"]
+        resolved_cmd = resolve_command(cmd)
+    if resolved_cmd is None:
+        print(f"❌ {name} - Command not found: {cmd[0]}")
+        return None
     
     print(f"🚀 Starting {name} on port {port}...")
+    # Service defaults only fill in variables the user has not exported
+    env = {**config.get("env", {}), **os.environ}
     
     try:
         # Start the process
         if sys.platform == "win32":
             process = subprocess.Popen(
-                cmd,
+                resolved_cmd,
                 cwd=str(cwd),
-                creationflags=subprocess.CREATE_NEW_CONSOLE,
-                shell=True
+                env=env,
+                creationflags=subprocess.CREATE_NEW_CONSOLE | subprocess.CREATE_NEW_PROCESS_GROUP
             )
         else:
+            # Output goes straight to this terminal: nothing reads a pipe, and
+            # a full one would block the service's logging
             process = subprocess.Popen(
-                cmd,
+                resolved_cmd,
                 cwd=str(cwd),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+                env=env
             )
         
         return process
@@ -152,14 +209,27 @@ def start_service(service_key: str, config: dict) -> subprocess.Popen | None:
         return None
 
 
-def wait_for_service(port: int, timeout: int = 30) -> bool:
-    """Wait for a service to be available on a port"""
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        if is_port_in_use(port):
-            return True
-        time.sleep(0.5)
-    return False
+def wait_for_service(port: int, timeout: int = 30, proc=None) -> bool:
+    """Wait for a service to be available on a port (gives up early if `proc` exits)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if proc is not None and proc.poll() is not None:
+            return False
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.setblocking(False)
+            err = s.connect_ex(('localhost', port))
+            # Any other error (e.g. ECONNREFUSED reported immediately) means not yet
+            if err in CONNECT_PENDING_ERRORS:
+                # The socket turns writable once the connect completes; a refused
+                # connect shows up as SO_ERROR (or in the exception set on Windows)
+                _, writable, failed = select.select([], [s], [s], min(remaining, PROCESS_POLL_INTERVAL))
+                if writable and not failed and s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    return True
+        # Nothing listening yet: retry shortly
+        time.sleep(min(CONNECT_RETRY_INTERVAL, max(0.0, deadline - time.monotonic())))
 
 
 def cleanup(signum=None, frame=None):
@@ -187,6 +257,7 @@ def print_banner():
 ╠═══════════════════════════════════════════════════════════╣
 ║  Services:                                                 ║
 ║  • ML Yield Predictor   - http://localhost:3002           ║
+║  • ML Predictor API     - http://localhost:8000           ║
 ║  • Chatbot Backend      - http://localhost:3001           ║
 ║  • Frontend             - http://localhost:5173           ║
 ║  • Ollama LLM           - http://localhost:11434          ║
@@ -215,29 +286,23 @@ def main():
     else:
         print("⏭️  Skipping Ollama check")
     
-    # Start ML API
-    ml_proc = start_service("ml_api", SERVICES["ml_api"])
-    if ml_proc:
-        running_processes.append(ml_proc)
-        time.sleep(2)  # Give it time to start
-    
-    # Start Chatbot Backend
-    backend_proc = start_service("chatbot_backend", SERVICES["chatbot_backend"])
-    if backend_proc:
-        running_processes.append(backend_proc)
-        time.sleep(2)
-    
-    # Start Frontend (unless skipped)
+    # Start all services in parallel
+    service_keys = ["ml_api", "ml_fastapi", "chatbot_backend"]
     if not args.no_frontend:
-        frontend_proc = start_service("frontend", SERVICES["frontend"])
-        if frontend_proc:
-            running_processes.append(frontend_proc)
+        service_keys.append("frontend")
     else:
         print("⏭️  Skipping frontend server")
     
-    # Wait for services to be ready
+    with ThreadPoolExecutor(max_workers=len(service_keys)) as pool:
+        processes = list(pool.map(lambda key: start_service(key, SERVICES[key]), service_keys))
+    running_processes.extend(proc for proc in processes if proc)
+    
+    # Wait for the newly started services to be ready
     print("\n⏳ Waiting for services to be ready...")
-    time.sleep(3)
+    started = [(SERVICES[key]["port"], proc) for key, proc in zip(service_keys, processes) if proc]
+    if started:
+        with ThreadPoolExecutor(max_workers=len(started)) as pool:
+            list(pool.map(lambda service: wait_for_service(service[0], proc=service[1]), started))
     
     # Check service status
     print("\n📊 Service Status:")
@@ -245,8 +310,9 @@ def main():
     
     services_to_check = [
         ("ML API", 3002),
+        ("ML Predictor API", 8000),
         ("Chatbot Backend", 3001),
-        ("Ollama", 11434),
+        ("Ollama", OLLAMA_PORT),
     ]
     if not args.no_frontend:
         services_to_check.append(("Frontend", 5173))